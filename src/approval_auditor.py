@@ -1,10 +1,23 @@
 """
 Core approval auditor logic for detecting and analyzing token approvals
 """
+from eth_abi import decode as abi_decode, encode as abi_encode
 from web3 import Web3
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+from typing import Iterable, List, Dict, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import lru_cache
+import json
 import logging
+import os
+import threading
+import time
+
+import diskcache
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from src.chain_config import (
     CHAIN_CONFIG,
@@ -12,31 +25,221 @@ from src.chain_config import (
     ERC721_APPROVALFORALL_TOPIC,
     UNLIMITED_APPROVAL_THRESHOLD,
     STALE_APPROVAL_SECONDS,
+    BLOCK_BATCH_SIZE,
+    LOG_CHUNK_SIZE,
+    LOG_SCAN_MAX_WORKERS,
+    EVENT_CACHE_WINDOW,
+    FINALITY_BLOCKS,
+    MULTICALL3_ADDRESS,
+    ALLOWANCE_BATCH_SIZE,
+    ERC20_ALLOWANCE_SELECTOR,
+    ERC20_APPROVE_SELECTOR,
+    ERC721_SETAPPROVALFORALL_SELECTOR,
+    AGGREGATE3_SELECTOR,
 )
 
 logger = logging.getLogger(__name__)
 
 
+# Checksumming keccaks the address on every call, and the same tokens and
+# spenders (routers, Permit2, ...) recur across many approvals — memoize it
+_checksum = lru_cache(maxsize=16384)(Web3.to_checksum_address)
+
+# Topic bytes for dispatching logs from the combined filter
+_ERC20_APPROVAL_TOPIC_BYTES = bytes.fromhex(ERC20_APPROVAL_TOPIC[2:])
+_ERC721_APPROVALFORALL_TOPIC_BYTES = bytes.fromhex(ERC721_APPROVALFORALL_TOPIC[2:])
+
+# Max (chain_id, block_number) -> timestamp entries kept in memory
+TIMESTAMP_CACHE_MAXSIZE = 100_000
+
+# Known scam/airdrop-spam token contracts (lowercase). Approvals on these
+# tokens are dropped before any allowance lookups — airdrop-polluted wallets
+# carry thousands of such approvals that would otherwise each cost an RPC.
+_DENYLIST_PATH = os.path.join(os.path.dirname(__file__), "token_denylist.json")
+with open(_DENYLIST_PATH) as _denylist_file:
+    TOKEN_DENYLIST = frozenset(addr.lower() for addr in json.load(_denylist_file))
+
+# Row type tags for ApprovalBatch
+ERC20_TYPE = 0
+ERC721_TYPE = 1
+
+
+@dataclass
+class ApprovalBatch:
+    """
+    Struct-of-arrays container for scanned approval events
+
+    One column per field instead of one dict per event roughly halves memory
+    on token-rich wallets and turns the risk-analysis pass into a tight scan
+    over parallel lists. `spenders` holds the spender for ERC-20 rows and the
+    operator for ERC-721 rows; `values` holds the approval amount for ERC-20
+    and 0/1 (approved) for ERC-721. Rows are materialized back to dicts only
+    at the API boundary via `to_dict`.
+    """
+
+    types: List[int] = field(default_factory=list)
+    token_addresses: List[str] = field(default_factory=list)
+    owners: List[str] = field(default_factory=list)
+    spenders: List[str] = field(default_factory=list)
+    values: List[int] = field(default_factory=list)
+    block_numbers: List[int] = field(default_factory=list)
+    timestamps: List[int] = field(default_factory=list)
+    tx_hashes: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def append(
+        self,
+        type_: int,
+        token_address: str,
+        owner: str,
+        spender: str,
+        value: int,
+        block_number: int,
+        timestamp: int,
+        tx_hash: str,
+    ):
+        """Append one event row"""
+        self.types.append(type_)
+        self.token_addresses.append(token_address)
+        self.owners.append(owner)
+        self.spenders.append(spender)
+        self.values.append(value)
+        self.block_numbers.append(block_number)
+        self.timestamps.append(timestamp)
+        self.tx_hashes.append(tx_hash)
+
+    def extend(self, other: "ApprovalBatch"):
+        """Append all rows from another batch"""
+        self.types.extend(other.types)
+        self.token_addresses.extend(other.token_addresses)
+        self.owners.extend(other.owners)
+        self.spenders.extend(other.spenders)
+        self.values.extend(other.values)
+        self.block_numbers.extend(other.block_numbers)
+        self.timestamps.extend(other.timestamps)
+        self.tx_hashes.extend(other.tx_hashes)
+
+    def to_dict(self, i: int) -> Dict:
+        """Materialize row i as the event dict shape used in API responses"""
+        if self.types[i] == ERC20_TYPE:
+            return {
+                "type": "ERC20",
+                "token_address": self.token_addresses[i],
+                "owner": self.owners[i],
+                "spender": self.spenders[i],
+                # Kept as int internally; stringified at the response boundary
+                "value": self.values[i],
+                "block_number": self.block_numbers[i],
+                "timestamp": self.timestamps[i],
+                "tx_hash": self.tx_hashes[i],
+            }
+        return {
+            "type": "ERC721",
+            "token_address": self.token_addresses[i],
+            "owner": self.owners[i],
+            "operator": self.spenders[i],
+            "approved": bool(self.values[i]),
+            "block_number": self.block_numbers[i],
+            "timestamp": self.timestamps[i],
+            "tx_hash": self.tx_hashes[i],
+        }
+
+# How long a cached head block number stays fresh — roughly one block
+# interval on the supported chains
+HEAD_BLOCK_TTL_SECONDS = 5.0
+
+
 class ApprovalAuditor:
     """Audits ERC-20 and ERC-721 approvals for a wallet"""
 
     def __init__(self):
         self.web3_connections = {}
+        self._http_sessions: Dict[int, requests.Session] = {}
+        self._connections_lock = threading.Lock()
+        # Block timestamps are immutable, so entries never expire; the
+        # OrderedDict is used as an LRU bounded by TIMESTAMP_CACHE_MAXSIZE
+        self._ts_cache: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
+        self._ts_cache_lock = threading.Lock()
+        # Parsed events from finalized windows never change, so they persist
+        # across process restarts
+        self._event_cache = diskcache.Cache(
+            os.getenv("EVENT_CACHE_DIR", ".approval_event_cache")
+        )
+        # chain_id -> (head block number, monotonic fetch time)
+        self._head_cache: Dict[int, Tuple[int, float]] = {}
+
+    def _get_session(self, chain_id: int) -> requests.Session:
+        """
+        Get or create a pooled, keep-alive HTTP session for a chain
+
+        Sized for the chunked/concurrent fetch paths so connections are
+        reused instead of paying TCP/TLS setup per request, with retries on
+        transient provider errors.
+        """
+        with self._connections_lock:
+            if chain_id not in self._http_sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=32,
+                    pool_maxsize=64,
+                    max_retries=Retry(
+                        total=3,
+                        backoff_factor=0.3,
+                        status_forcelist=[429, 502, 503, 504],
+                    ),
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._http_sessions[chain_id] = session
+
+            return self._http_sessions[chain_id]
 
     def get_web3(self, chain_id: int) -> Web3:
         """Get or create Web3 connection for a chain"""
-        if chain_id not in self.web3_connections:
-            if chain_id not in CHAIN_CONFIG:
-                raise ValueError(f"Chain {chain_id} not supported")
+        if chain_id not in CHAIN_CONFIG:
+            raise ValueError(f"Chain {chain_id} not supported")
+
+        session = self._get_session(chain_id)
+
+        # Lock so concurrent per-chain scans don't race on connection setup
+        with self._connections_lock:
+            if chain_id not in self.web3_connections:
+                rpc_url = CHAIN_CONFIG[chain_id]["rpc"]
+                self.web3_connections[chain_id] = Web3(
+                    Web3.HTTPProvider(
+                        rpc_url, session=session, request_kwargs={"timeout": 30}
+                    )
+                )
+
+            return self.web3_connections[chain_id]
 
-            rpc_url = CHAIN_CONFIG[chain_id]["rpc"]
-            self.web3_connections[chain_id] = Web3(Web3.HTTPProvider(rpc_url))
+    def _get_head_block(self, chain_id: int) -> int:
+        """Get the chain head block number, cached for HEAD_BLOCK_TTL_SECONDS"""
+        cached = self._head_cache.get(chain_id)
+        if cached is not None:
+            block_number, fetched_at = cached
+            if time.monotonic() - fetched_at < HEAD_BLOCK_TTL_SECONDS:
+                return block_number
 
-        return self.web3_connections[chain_id]
+        block_number = self.get_web3(chain_id).eth.block_number
+        self._head_cache[chain_id] = (block_number, time.monotonic())
+        return block_number
+
+    @staticmethod
+    def _owner_topic(wallet_address: str) -> str:
+        """Build the 32-byte left-padded topics[1] filter for an address"""
+        return "0x" + "0" * 24 + wallet_address[2:].lower()
 
     def scan_approval_events(
-        self, chain_id: int, wallet: str, from_block: int = 0, to_block: str = "latest"
-    ) -> List[Dict]:
+        self,
+        chain_id: int,
+        wallet: str,
+        from_block: int = 0,
+        to_block: str = "latest",
+        owner_topic: Optional[str] = None,
+    ) -> ApprovalBatch:
         """
         Scan for Approval and ApprovalForAll events for a wallet
 
@@ -45,126 +248,303 @@ class ApprovalAuditor:
             wallet: Wallet address to audit
             from_block: Starting block number
             to_block: Ending block number or 'latest'
+            owner_topic: Precomputed topics[1] filter (built here if omitted)
 
         Returns:
-            List of approval events with metadata
+            ApprovalBatch of parsed approval events
         """
         try:
-            w3 = self.get_web3(chain_id)
-            wallet_address = Web3.to_checksum_address(wallet)
+            wallet_address = _checksum(wallet)
+            if owner_topic is None:
+                owner_topic = self._owner_topic(wallet_address)
 
             # Get current block for timestamp calculations
-            current_block = w3.eth.block_number
+            current_block = self._get_head_block(chain_id)
 
             # Limit scan to recent blocks to avoid timeouts (last 100k blocks)
             if from_block == 0:
                 from_block = max(0, current_block - 100000)
 
+            # Resolve to a concrete block so the range can be windowed
+            if to_block == "latest":
+                to_block = current_block
+
             logger.info(
                 f"Scanning approvals for {wallet_address} on chain {chain_id} "
                 f"from block {from_block} to {to_block}"
             )
 
-            # Scan for ERC-20 Approval events
-            erc20_filter = {
-                "fromBlock": from_block,
-                "toBlock": to_block,
+            # One combined filter: topics[0] as an array means OR, and the
+            # owner sits in topics[1] for both event signatures
+            approval_filter = {
                 "topics": [
-                    ERC20_APPROVAL_TOPIC,
-                    Web3.to_hex(text=wallet_address.lower()).ljust(66, "0"),
+                    [ERC20_APPROVAL_TOPIC, ERC721_APPROVALFORALL_TOPIC],
+                    owner_topic,
                 ],
             }
 
-            erc20_events = []
-            try:
-                erc20_logs = w3.eth.get_logs(erc20_filter)
-                for log in erc20_logs:
-                    erc20_events.append(self._parse_erc20_approval(w3, log))
-            except Exception as e:
-                logger.warning(f"Error fetching ERC-20 approvals: {e}")
+            # Walk the range in cache-aligned windows: finalized windows are
+            # served from (and persisted to) the disk cache, so repeat audits
+            # only pay RPC for the unfinalized tail
+            batch = ApprovalBatch()
+            for window_from, window_to in self._cache_windows(from_block, to_block):
+                cacheable = (
+                    window_from % EVENT_CACHE_WINDOW == 0
+                    and window_to == window_from + EVENT_CACHE_WINDOW - 1
+                    and current_block - window_to > FINALITY_BLOCKS
+                )
+                # v2: values are ApprovalBatch instances, not dict lists
+                cache_key = (
+                    f"v2:{chain_id}:{wallet_address.lower()}:{window_from}:{window_to}"
+                )
 
-            # Scan for ERC-721 ApprovalForAll events
-            erc721_filter = {
-                "fromBlock": from_block,
-                "toBlock": to_block,
-                "topics": [
-                    ERC721_APPROVALFORALL_TOPIC,
-                    Web3.to_hex(text=wallet_address.lower()).ljust(66, "0"),
-                ],
-            }
+                if cacheable:
+                    cached = self._event_cache.get(cache_key)
+                    if cached is not None:
+                        batch.extend(cached)
+                        continue
 
-            erc721_events = []
-            try:
-                erc721_logs = w3.eth.get_logs(erc721_filter)
-                for log in erc721_logs:
-                    erc721_events.append(self._parse_erc721_approval(w3, log))
-            except Exception as e:
-                logger.warning(f"Error fetching ERC-721 approvals: {e}")
+                window_batch = self._scan_window(
+                    chain_id, approval_filter, window_from, window_to
+                )
+
+                if cacheable:
+                    self._event_cache.set(cache_key, window_batch)
 
-            all_events = erc20_events + erc721_events
+                batch.extend(window_batch)
+
+            erc20_count = sum(1 for t in batch.types if t == ERC20_TYPE)
             logger.info(
-                f"Found {len(erc20_events)} ERC-20 and {len(erc721_events)} ERC-721 approvals"
+                f"Found {erc20_count} ERC-20 and "
+                f"{len(batch) - erc20_count} ERC-721 approvals"
             )
 
-            return all_events
+            return batch
 
         except Exception as e:
             logger.error(f"Error scanning approval events: {e}")
-            return []
+            return ApprovalBatch()
 
-    def _parse_erc20_approval(self, w3: Web3, log) -> Dict:
-        """Parse an ERC-20 Approval event"""
-        token_address = log["address"]
-        owner = "0x" + log["topics"][1].hex()[-40:]
-        spender = "0x" + log["topics"][2].hex()[-40:]
-        value = int(log["data"].hex(), 16)
-        block_number = log["blockNumber"]
-        tx_hash = log["transactionHash"].hex()
+    @staticmethod
+    def _cache_windows(from_block: int, to_block: int) -> List[Tuple[int, int]]:
+        """
+        Split a block range into windows aligned to EVENT_CACHE_WINDOW
 
-        # Get block timestamp
-        try:
-            block = w3.eth.get_block(block_number)
-            timestamp = block["timestamp"]
-        except Exception:
-            timestamp = 0
+        Alignment keeps window boundaries identical across runs, so cached
+        windows are reusable regardless of the requested range. Only the
+        leading and trailing windows can be partial.
+        """
+        windows = []
+        start = from_block
+        while start <= to_block:
+            aligned_end = (start // EVENT_CACHE_WINDOW + 1) * EVENT_CACHE_WINDOW - 1
+            windows.append((start, min(aligned_end, to_block)))
+            start = aligned_end + 1
+        return windows
+
+    def _scan_window(
+        self, chain_id: int, approval_filter: Dict, from_block: int, to_block: int
+    ) -> ApprovalBatch:
+        """Fetch and parse approval events for one block window"""
+        logs = self._fetch_logs_chunked(chain_id, approval_filter, from_block, to_block)
+
+        # Resolve timestamps for all distinct blocks in one batch instead of
+        # one eth_getBlock round-trip per log
+        block_numbers = {log["blockNumber"] for log in logs}
+        timestamps = self._fetch_block_timestamps(chain_id, block_numbers)
+
+        return self._parse_logs(logs, timestamps)
+
+    @staticmethod
+    def _parse_logs(logs: List, timestamps: Dict[int, int]) -> ApprovalBatch:
+        """Parse raw approval logs into an ApprovalBatch"""
+        batch = ApprovalBatch()
+        for log in logs:
+            topic0 = bytes(log["topics"][0])
+            if topic0 == _ERC20_APPROVAL_TOPIC_BYTES:
+                type_ = ERC20_TYPE
+            elif topic0 == _ERC721_APPROVALFORALL_TOPIC_BYTES:
+                type_ = ERC721_TYPE
+            else:
+                continue
 
-        return {
-            "type": "ERC20",
-            "token_address": Web3.to_checksum_address(token_address),
-            "owner": Web3.to_checksum_address(owner),
-            "spender": Web3.to_checksum_address(spender),
-            "value": str(value),
-            "block_number": block_number,
-            "timestamp": timestamp,
-            "tx_hash": tx_hash,
-        }
+            block_number = log["blockNumber"]
+            batch.append(
+                type_,
+                _checksum(log["address"]),
+                # Addresses are the last 20 bytes of the 32-byte topics
+                _checksum(log["topics"][1][-20:]),
+                _checksum(log["topics"][2][-20:]),
+                # HexBytes subclasses bytes; decode directly instead of
+                # round-tripping through a hex string
+                int.from_bytes(bytes(log["data"]), "big"),
+                block_number,
+                timestamps.get(block_number, 0),
+                log["transactionHash"].hex(),
+            )
+        return batch
 
-    def _parse_erc721_approval(self, w3: Web3, log) -> Dict:
-        """Parse an ERC-721 ApprovalForAll event"""
-        token_address = log["address"]
-        owner = "0x" + log["topics"][1].hex()[-40:]
-        operator = "0x" + log["topics"][2].hex()[-40:]
-        approved = bool(int(log["data"].hex(), 16))
-        block_number = log["blockNumber"]
-        tx_hash = log["transactionHash"].hex()
+    def _get_logs_window(self, w3: Web3, base_filter: Dict, start: int, end: int) -> List:
+        """
+        Fetch logs for one block window, bisecting on result-limit errors
 
-        # Get block timestamp
+        Providers cap eth_getLogs responses ("query returned more than X
+        results", response-size limits, timeouts). When a window trips such a
+        limit, split it in half and retry each half; other errors propagate.
+        """
         try:
-            block = w3.eth.get_block(block_number)
-            timestamp = block["timestamp"]
-        except Exception:
-            timestamp = 0
+            return w3.eth.get_logs({**base_filter, "fromBlock": start, "toBlock": end})
+        except Exception as e:
+            message = str(e).lower()
+            retryable = any(
+                hint in message
+                for hint in ("more than", "limit", "too large", "too many", "timeout")
+            )
+            if retryable and end > start:
+                mid = (start + end) // 2
+                logger.debug(
+                    f"eth_getLogs window {start}-{end} hit a provider limit, "
+                    f"bisecting: {e}"
+                )
+                return self._get_logs_window(
+                    w3, base_filter, start, mid
+                ) + self._get_logs_window(w3, base_filter, mid + 1, end)
+            raise
+
+    def _fetch_logs_chunked(
+        self, chain_id: int, base_filter: Dict, from_block: int, to_block: int
+    ) -> List:
+        """
+        Fetch logs over a block range in LOG_CHUNK_SIZE windows, concurrently
 
-        return {
-            "type": "ERC721",
-            "token_address": Web3.to_checksum_address(token_address),
-            "owner": Web3.to_checksum_address(owner),
-            "operator": Web3.to_checksum_address(operator),
-            "approved": approved,
-            "block_number": block_number,
-            "timestamp": timestamp,
-            "tx_hash": tx_hash,
-        }
+        Args:
+            chain_id: Chain ID
+            base_filter: eth_getLogs filter without fromBlock/toBlock
+            from_block: Starting block number
+            to_block: Ending block number (inclusive)
+
+        Returns:
+            Concatenated logs in window order (windows that fail are skipped)
+        """
+        if to_block < from_block:
+            return []
+
+        w3 = self.get_web3(chain_id)
+        windows = [
+            (start, min(start + LOG_CHUNK_SIZE - 1, to_block))
+            for start in range(from_block, to_block + 1, LOG_CHUNK_SIZE)
+        ]
+
+        logs = []
+        with ThreadPoolExecutor(
+            max_workers=min(LOG_SCAN_MAX_WORKERS, len(windows))
+        ) as executor:
+            futures = [
+                executor.submit(self._get_logs_window, w3, base_filter, start, end)
+                for start, end in windows
+            ]
+            for (start, end), future in zip(windows, futures):
+                try:
+                    logs.extend(future.result())
+                except Exception as e:
+                    logger.warning(
+                        f"Error fetching logs for blocks {start}-{end} on "
+                        f"chain {chain_id}: {e}"
+                    )
+
+        return logs
+
+    def _fetch_block_timestamps(
+        self, chain_id: int, block_numbers: Iterable[int]
+    ) -> Dict[int, int]:
+        """
+        Fetch timestamps for a set of blocks via batched eth_getBlockByNumber
+
+        Issues one JSON-RPC batch request per BLOCK_BATCH_SIZE blocks instead of
+        one HTTP round-trip per block. Falls back to per-block calls if the
+        provider rejects the batch.
+
+        Timestamps already seen for this chain are served from the in-process
+        LRU cache; only misses hit the RPC.
+
+        Args:
+            chain_id: Chain ID
+            block_numbers: Block numbers to resolve
+
+        Returns:
+            Dict mapping block number to timestamp (missing blocks omitted)
+        """
+        timestamps: Dict[int, int] = {}
+        misses = []
+        for block_number in set(block_numbers):
+            cached = self._ts_cache_get(chain_id, block_number)
+            if cached is not None:
+                timestamps[block_number] = cached
+            else:
+                misses.append(block_number)
+
+        blocks = sorted(misses)
+        if not blocks:
+            return timestamps
+
+        rpc_url = CHAIN_CONFIG[chain_id]["rpc"]
+
+        for i in range(0, len(blocks), BLOCK_BATCH_SIZE):
+            chunk = blocks[i : i + BLOCK_BATCH_SIZE]
+            payload = [
+                {
+                    "jsonrpc": "2.0",
+                    "method": "eth_getBlockByNumber",
+                    "params": [hex(block_number), False],
+                    "id": block_number,
+                }
+                for block_number in chunk
+            ]
+
+            try:
+                response = self._get_session(chain_id).post(
+                    rpc_url, json=payload, timeout=30
+                )
+                response.raise_for_status()
+                for item in response.json():
+                    block = item.get("result")
+                    if block:
+                        timestamps[int(item["id"])] = int(block["timestamp"], 16)
+            except Exception as e:
+                logger.warning(
+                    f"Batch block fetch failed on chain {chain_id}, "
+                    f"falling back to per-block calls: {e}"
+                )
+                w3 = self.get_web3(chain_id)
+                for block_number in chunk:
+                    try:
+                        timestamps[block_number] = w3.eth.get_block(block_number)[
+                            "timestamp"
+                        ]
+                    except Exception:
+                        pass
+
+        for block_number in blocks:
+            if block_number in timestamps:
+                self._ts_cache_put(chain_id, block_number, timestamps[block_number])
+
+        return timestamps
+
+    def _ts_cache_get(self, chain_id: int, block_number: int) -> Optional[int]:
+        """Look up a cached block timestamp, refreshing its LRU position"""
+        key = (chain_id, block_number)
+        with self._ts_cache_lock:
+            timestamp = self._ts_cache.get(key)
+            if timestamp is not None:
+                self._ts_cache.move_to_end(key)
+            return timestamp
+
+    def _ts_cache_put(self, chain_id: int, block_number: int, timestamp: int):
+        """Store a block timestamp, evicting the least recently used entry"""
+        with self._ts_cache_lock:
+            self._ts_cache[(chain_id, block_number)] = timestamp
+            if len(self._ts_cache) > TIMESTAMP_CACHE_MAXSIZE:
+                self._ts_cache.popitem(last=False)
 
     def get_current_allowance(
         self, chain_id: int, token_address: str, owner: str, spender: str
@@ -184,20 +564,23 @@ class ApprovalAuditor:
         try:
             w3 = self.get_web3(chain_id)
 
-            # Build allowance(address,address) call
-            function_signature = Web3.keccak(text="allowance(address,address)")[:4]
-            owner_padded = owner[2:].lower().rjust(64, "0")
-            spender_padded = spender[2:].lower().rjust(64, "0")
-            call_data = function_signature.hex() + owner_padded + spender_padded
+            # Build allowance(address,address) call as raw bytes
+            call_data = (
+                ERC20_ALLOWANCE_SELECTOR
+                + b"\x00" * 12
+                + bytes.fromhex(owner[2:])
+                + b"\x00" * 12
+                + bytes.fromhex(spender[2:])
+            )
 
             result = w3.eth.call(
                 {
-                    "to": Web3.to_checksum_address(token_address),
+                    "to": _checksum(token_address),
                     "data": call_data,
                 }
             )
 
-            allowance = int(result.hex(), 16)
+            allowance = int.from_bytes(result, "big")
             return allowance
 
         except Exception as e:
@@ -206,65 +589,240 @@ class ApprovalAuditor:
             )
             return None
 
-    def analyze_approval_risks(
-        self, approvals: List[Dict], chain_id: int
-    ) -> List[Dict]:
+    def _fetch_allowances_multicall(
+        self, chain_id: int, triples: List[Tuple[str, str, str]]
+    ) -> Dict[Tuple[str, str, str], Optional[int]]:
         """
-        Analyze approvals for risk factors
+        Fetch allowances for (token, owner, spender) triples via Multicall3
+
+        Packs all allowance(owner, spender) reads into a single aggregate3
+        call, so N lookups cost one eth_call round-trip.
 
         Args:
-            approvals: List of approval events
             chain_id: Chain ID
+            triples: List of (token_address, owner, spender) tuples
 
         Returns:
-            List of approvals with risk analysis
+            Dict mapping each triple to its allowance (None if the call failed)
+        """
+        w3 = self.get_web3(chain_id)
+
+        calls = []
+        for token_address, owner, spender in triples:
+            call_data = ERC20_ALLOWANCE_SELECTOR + abi_encode(
+                ["address", "address"], [owner, spender]
+            )
+            # allowFailure=True so one broken token doesn't revert the batch
+            calls.append((_checksum(token_address), True, call_data))
+
+        result = w3.eth.call(
+            {
+                "to": MULTICALL3_ADDRESS,
+                "data": AGGREGATE3_SELECTOR
+                + abi_encode(["(address,bool,bytes)[]"], [calls]),
+            }
+        )
+
+        results = abi_decode(["(bool,bytes)[]"], bytes(result))[0]
+
+        allowances = {}
+        for triple, (success, return_data) in zip(triples, results):
+            if success and len(return_data) >= 32:
+                allowances[triple] = int.from_bytes(return_data[:32], "big")
+            else:
+                allowances[triple] = None
+        return allowances
+
+    def _fetch_allowances_chunk(
+        self, chain_id: int, triples: List[Tuple[str, str, str]]
+    ) -> Dict[Tuple[str, str, str], Optional[int]]:
+        """
+        Fetch allowances for one chunk of triples, Multicall3 first
+
+        Falls back to one eth_call per triple if the aggregate call fails
+        (e.g. Multicall3 unavailable on a custom RPC).
+        """
+        try:
+            return self._fetch_allowances_multicall(chain_id, triples)
+        except Exception as e:
+            logger.warning(
+                f"Multicall3 allowance fetch failed on chain {chain_id}, "
+                f"falling back to per-call lookups: {e}"
+            )
+            return {
+                triple: self.get_current_allowance(chain_id, *triple)
+                for triple in triples
+            }
+
+    def _fetch_allowances(
+        self, chain_id: int, triples: List[Tuple[str, str, str]]
+    ) -> Dict[Tuple[str, str, str], Optional[int]]:
+        """
+        Fetch allowances for the given triples
+
+        Splits the reads into ALLOWANCE_BATCH_SIZE chunks so one aggregate
+        call never exceeds provider response limits on approval-heavy
+        wallets, and fetches multiple chunks concurrently.
+        """
+        if not triples:
+            return {}
+
+        chunks = [
+            triples[i : i + ALLOWANCE_BATCH_SIZE]
+            for i in range(0, len(triples), ALLOWANCE_BATCH_SIZE)
+        ]
+
+        if len(chunks) == 1:
+            return self._fetch_allowances_chunk(chain_id, chunks[0])
+
+        allowances: Dict[Tuple[str, str, str], Optional[int]] = {}
+        with ThreadPoolExecutor(
+            max_workers=min(len(chunks), LOG_SCAN_MAX_WORKERS)
+        ) as executor:
+            for result in executor.map(
+                lambda chunk: self._fetch_allowances_chunk(chain_id, chunk), chunks
+            ):
+                allowances.update(result)
+        return allowances
+
+    @staticmethod
+    def _latest_indices(batch: ApprovalBatch) -> List[int]:
+        """
+        Select the most recent row per (type, token, owner, spender) pair
+
+        Wallets commonly re-approve the same spender on the same token; only
+        the latest event reflects on-chain state, so older rows are dropped
+        before any allowance lookups or risk checks.
+        """
+        latest: Dict[Tuple, int] = {}
+        for i in range(len(batch)):
+            key = (
+                batch.types[i],
+                batch.token_addresses[i],
+                batch.owners[i],
+                batch.spenders[i],
+            )
+            held = latest.get(key)
+            if held is None or batch.block_numbers[i] >= batch.block_numbers[held]:
+                latest[key] = i
+        return sorted(latest.values())
+
+    @staticmethod
+    def _erc20_triples(
+        batch: ApprovalBatch, indices: List[int]
+    ) -> List[Tuple[str, str, str]]:
+        """Collect distinct (token, owner, spender) triples for ERC-20 rows"""
+        return sorted(
+            {
+                (batch.token_addresses[i], batch.owners[i], batch.spenders[i])
+                for i in indices
+                if batch.types[i] == ERC20_TYPE
+                and batch.token_addresses[i].lower() not in TOKEN_DENYLIST
+            }
+        )
+
+    @staticmethod
+    def _compute_risk_masks(
+        batch: ApprovalBatch, indices: List[int], stale_cutoff: int
+    ) -> Tuple[List[bool], List[bool]]:
+        """
+        Compute per-row (revoked, stale) masks over the batch columns
+
+        Pure column scan with no dict or attribute access inside the loop,
+        separated from the dict-materializing post-pass in _flag_risks.
+        """
+        values = batch.values
+        timestamps = batch.timestamps
+        revoked = [values[i] == 0 for i in indices]
+        stale = [0 < timestamps[i] < stale_cutoff for i in indices]
+        return revoked, stale
+
+    def _flag_risks(
+        self,
+        batch: ApprovalBatch,
+        indices: List[int],
+        allowances: Dict[Tuple[str, str, str], Optional[int]],
+    ) -> List[Dict]:
+        """
+        Run the risk checks over batch rows and materialize flagged results
+
+        Only rows that survive the revoked/zero-allowance filters are turned
+        into dicts.
         """
         analyzed = []
-        current_time = datetime.utcnow().timestamp()
+        current_time = int(time.time())
+        stale_cutoff = current_time - STALE_APPROVAL_SECONDS
+
+        types = batch.types
+        timestamps = batch.timestamps
+
+        revoked_mask, stale_mask = self._compute_risk_masks(
+            batch, indices, stale_cutoff
+        )
 
-        for approval in approvals:
+        for pos, i in enumerate(indices):
             risk_flags = []
 
             # Skip revoked approvals (ERC-20 with value 0, ERC-721 with approved=False)
-            if approval["type"] == "ERC20" and int(approval["value"]) == 0:
+            if revoked_mask[pos]:
                 continue
-            if approval["type"] == "ERC721" and not approval.get("approved", True):
+
+            # Skip known scam/airdrop tokens entirely
+            if batch.token_addresses[i].lower() in TOKEN_DENYLIST:
                 continue
 
-            # For ERC-20, get current allowance
-            if approval["type"] == "ERC20":
-                current_allowance = self.get_current_allowance(
-                    chain_id,
-                    approval["token_address"],
-                    approval["owner"],
-                    approval["spender"],
+            current_allowance = None
+            if types[i] == ERC20_TYPE:
+                current_allowance = allowances.get(
+                    (batch.token_addresses[i], batch.owners[i], batch.spenders[i])
                 )
 
-                if current_allowance is not None:
-                    approval["current_allowance"] = str(current_allowance)
-
-                    # Skip if current allowance is 0 (already revoked)
-                    if current_allowance == 0:
-                        continue
-
-                    # Check for unlimited approval
-                    if current_allowance >= UNLIMITED_APPROVAL_THRESHOLD:
-                        risk_flags.append("unlimited_approval")
-                else:
-                    approval["current_allowance"] = "unknown"
-
-            # Check for stale approval (>90 days old)
-            if approval["timestamp"] > 0:
-                age_seconds = current_time - approval["timestamp"]
-                if age_seconds > STALE_APPROVAL_SECONDS:
-                    risk_flags.append("stale_approval")
-                    approval["age_days"] = int(age_seconds / (24 * 60 * 60))
+                # Skip if current allowance is 0 (already revoked)
+                if current_allowance == 0:
+                    continue
+
+                # Check for unlimited approval
+                if (
+                    current_allowance is not None
+                    and current_allowance >= UNLIMITED_APPROVAL_THRESHOLD
+                ):
+                    risk_flags.append("unlimited_approval")
+
+            approval = batch.to_dict(i)
+            if types[i] == ERC20_TYPE:
+                approval["current_allowance"] = (
+                    str(current_allowance) if current_allowance is not None else "unknown"
+                )
+            # Stale approval (>90 days old)
+            if stale_mask[pos]:
+                risk_flags.append("stale_approval")
+                approval["age_days"] = (current_time - timestamps[i]) // 86400
 
             approval["risk_flags"] = risk_flags
             analyzed.append(approval)
 
         return analyzed
 
+    def analyze_approval_risks(
+        self, batch: ApprovalBatch, chain_id: int
+    ) -> List[Dict]:
+        """
+        Analyze approvals for risk factors
+
+        Args:
+            batch: Scanned approval events
+            chain_id: Chain ID
+
+        Returns:
+            List of approval dicts with risk analysis
+        """
+        indices = self._latest_indices(batch)
+
+        # Batch all ERC-20 allowance reads into one Multicall3 round-trip
+        allowances = self._fetch_allowances(chain_id, self._erc20_triples(batch, indices))
+
+        return self._flag_risks(batch, indices, allowances)
+
     def build_revoke_transaction(
         self, approval: Dict, chain_id: int
     ) -> Optional[Dict]:
@@ -281,32 +839,34 @@ class ApprovalAuditor:
         try:
             if approval["type"] == "ERC20":
                 # approve(spender, 0)
-                function_signature = Web3.keccak(text="approve(address,uint256)")[:4]
-                spender_padded = approval["spender"][2:].lower().rjust(64, "0")
-                amount_padded = "0".rjust(64, "0")
-                data = function_signature.hex() + spender_padded + amount_padded
+                data = (
+                    ERC20_APPROVE_SELECTOR
+                    + b"\x00" * 12
+                    + bytes.fromhex(approval["spender"][2:])
+                    + b"\x00" * 32  # amount 0
+                )
 
                 return {
                     "to": approval["token_address"],
                     "from": approval["owner"],
-                    "data": data,
+                    "data": "0x" + data.hex(),
                     "value": "0",
                     "chainId": chain_id,
                 }
 
             elif approval["type"] == "ERC721":
                 # setApprovalForAll(operator, false)
-                function_signature = Web3.keccak(text="setApprovalForAll(address,bool)")[
-                    :4
-                ]
-                operator_padded = approval["operator"][2:].lower().rjust(64, "0")
-                approved_padded = "0".rjust(64, "0")  # false
-                data = function_signature.hex() + operator_padded + approved_padded
+                data = (
+                    ERC721_SETAPPROVALFORALL_SELECTOR
+                    + b"\x00" * 12
+                    + bytes.fromhex(approval["operator"][2:])
+                    + b"\x00" * 32  # false
+                )
 
                 return {
                     "to": approval["token_address"],
                     "from": approval["owner"],
-                    "data": data,
+                    "data": "0x" + data.hex(),
                     "value": "0",
                     "chainId": chain_id,
                 }
@@ -315,6 +875,73 @@ class ApprovalAuditor:
             logger.error(f"Error building revoke transaction: {e}")
             return None
 
+    def _audit_chain(
+        self,
+        chain_id: int,
+        wallet: str,
+        from_block: int = 0,
+        owner_topic: Optional[str] = None,
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Scan, analyze, and build revoke data for a single chain
+
+        Args:
+            chain_id: Chain ID to scan
+            wallet: Wallet address to audit
+            from_block: Starting block (0 for auto)
+            owner_topic: Precomputed topics[1] filter (built here if omitted)
+
+        Returns:
+            Tuple of (risky approvals, revoke transactions)
+        """
+        # Scan for approvals
+        batch = self.scan_approval_events(
+            chain_id, wallet, from_block, owner_topic=owner_topic
+        )
+
+        # Analyze risks
+        analyzed = self.analyze_approval_risks(batch, chain_id)
+
+        # Build revoke transactions for risky approvals
+        risky_approvals = []
+        revoke_transactions = []
+        for approval in analyzed:
+            if approval.get("risk_flags"):
+                approval["chain_id"] = chain_id
+                approval["chain_name"] = CHAIN_CONFIG[chain_id]["name"]
+
+                revoke_tx = self.build_revoke_transaction(approval, chain_id)
+                if revoke_tx:
+                    revoke_transactions.append(revoke_tx)
+
+                # uint256 values overflow JSON numbers; stringify at the boundary
+                if "value" in approval:
+                    approval["value"] = str(approval["value"])
+
+                risky_approvals.append(approval)
+
+        return risky_approvals, revoke_transactions
+
+    def audit_single_chain(
+        self, wallet: str, chain_id: int, from_block: int = 0
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Audit one chain for a wallet
+
+        Public wrapper over _audit_chain for callers that fan out across
+        chains themselves (the API layer schedules one task per chain).
+
+        Args:
+            wallet: Wallet address to audit
+            chain_id: Chain ID to scan
+            from_block: Starting block (0 for auto)
+
+        Returns:
+            Tuple of (risky approvals, revoke transactions)
+        """
+        owner_topic = self._owner_topic(_checksum(wallet))
+        return self._audit_chain(chain_id, wallet, from_block, owner_topic)
+
     def audit_wallet(
         self, wallet: str, chains: List[int], from_block: int = 0
     ) -> Dict:
@@ -332,28 +959,36 @@ class ApprovalAuditor:
         all_approvals = []
         revoke_transactions = []
 
+        valid_chains = []
         for chain_id in chains:
             if chain_id not in CHAIN_CONFIG:
                 logger.warning(f"Chain {chain_id} not supported, skipping")
                 continue
+            valid_chains.append(chain_id)
+
+        # The topic filter is chain-independent; build it once for all scans
+        owner_topic = self._owner_topic(_checksum(wallet))
+
+        # Each chain is independent RPC work, so scan them concurrently
+        if valid_chains:
+            with ThreadPoolExecutor(max_workers=len(valid_chains)) as executor:
+                futures = {
+                    executor.submit(
+                        self._audit_chain, chain_id, wallet, from_block, owner_topic
+                    ): chain_id
+                    for chain_id in valid_chains
+                }
 
-            # Scan for approvals
-            approvals = self.scan_approval_events(chain_id, wallet, from_block)
-
-            # Analyze risks
-            analyzed = self.analyze_approval_risks(approvals, chain_id)
-
-            # Build revoke transactions for risky approvals
-            for approval in analyzed:
-                if approval.get("risk_flags"):
-                    approval["chain_id"] = chain_id
-                    approval["chain_name"] = CHAIN_CONFIG[chain_id]["name"]
-
-                    revoke_tx = self.build_revoke_transaction(approval, chain_id)
-                    if revoke_tx:
-                        revoke_transactions.append(revoke_tx)
+                for future in as_completed(futures):
+                    chain_id = futures[future]
+                    try:
+                        approvals, revoke_txs = future.result()
+                    except Exception as e:
+                        logger.error(f"Error auditing chain {chain_id}: {e}")
+                        continue
 
-                    all_approvals.append(approval)
+                    all_approvals.extend(approvals)
+                    revoke_transactions.extend(revoke_txs)
 
         return {
             "wallet": wallet,
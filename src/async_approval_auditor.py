@@ -0,0 +1,506 @@
+"""
+Async approval auditor - AsyncWeb3/aiohttp variant of ApprovalAuditor
+
+One event loop multiplexes all in-flight RPC calls (log windows x chains x
+allowance batches) instead of dedicating a thread per blocking request.
+Parsing, risk flagging, and revoke-transaction building are inherited from
+the sync ApprovalAuditor; only the I/O paths are reimplemented as coroutines.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+from eth_abi import decode as abi_decode, encode as abi_encode
+from web3 import AsyncWeb3, AsyncHTTPProvider
+
+from src.approval_auditor import (
+    ApprovalAuditor,
+    ApprovalBatch,
+    HEAD_BLOCK_TTL_SECONDS,
+    _checksum,
+)
+from src.chain_config import (
+    CHAIN_CONFIG,
+    ERC20_APPROVAL_TOPIC,
+    ERC721_APPROVALFORALL_TOPIC,
+    BLOCK_BATCH_SIZE,
+    LOG_CHUNK_SIZE,
+    LOG_SCAN_MAX_WORKERS,
+    EVENT_CACHE_WINDOW,
+    FINALITY_BLOCKS,
+    MULTICALL3_ADDRESS,
+    ALLOWANCE_BATCH_SIZE,
+    ERC20_ALLOWANCE_SELECTOR,
+    AGGREGATE3_SELECTOR,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncApprovalAuditor(ApprovalAuditor):
+    """Audits ERC-20 and ERC-721 approvals using async RPC I/O"""
+
+    def __init__(self):
+        super().__init__()
+        self.async_web3_connections: Dict[int, AsyncWeb3] = {}
+
+    def get_async_web3(self, chain_id: int) -> AsyncWeb3:
+        """Get or create AsyncWeb3 connection for a chain"""
+        if chain_id not in CHAIN_CONFIG:
+            raise ValueError(f"Chain {chain_id} not supported")
+
+        if chain_id not in self.async_web3_connections:
+            rpc_url = CHAIN_CONFIG[chain_id]["rpc"]
+            self.async_web3_connections[chain_id] = AsyncWeb3(
+                AsyncHTTPProvider(rpc_url)
+            )
+
+        return self.async_web3_connections[chain_id]
+
+    async def _get_head_block_async(self, chain_id: int) -> int:
+        """Get the chain head block number, cached for HEAD_BLOCK_TTL_SECONDS"""
+        cached = self._head_cache.get(chain_id)
+        if cached is not None:
+            block_number, fetched_at = cached
+            if time.monotonic() - fetched_at < HEAD_BLOCK_TTL_SECONDS:
+                return block_number
+
+        block_number = await self.get_async_web3(chain_id).eth.block_number
+        self._head_cache[chain_id] = (block_number, time.monotonic())
+        return block_number
+
+    async def scan_approval_events_async(
+        self,
+        chain_id: int,
+        wallet: str,
+        from_block: int = 0,
+        to_block: str = "latest",
+        owner_topic: Optional[str] = None,
+    ) -> ApprovalBatch:
+        """
+        Scan for Approval and ApprovalForAll events for a wallet
+
+        Async counterpart of ApprovalAuditor.scan_approval_events; cache
+        layout and parsing are shared with the sync path.
+        """
+        try:
+            wallet_address = _checksum(wallet)
+            if owner_topic is None:
+                owner_topic = self._owner_topic(wallet_address)
+
+            current_block = await self._get_head_block_async(chain_id)
+
+            # Limit scan to recent blocks to avoid timeouts (last 100k blocks)
+            if from_block == 0:
+                from_block = max(0, current_block - 100000)
+
+            if to_block == "latest":
+                to_block = current_block
+
+            logger.info(
+                f"Scanning approvals for {wallet_address} on chain {chain_id} "
+                f"from block {from_block} to {to_block}"
+            )
+
+            approval_filter = {
+                "topics": [
+                    [ERC20_APPROVAL_TOPIC, ERC721_APPROVALFORALL_TOPIC],
+                    owner_topic,
+                ],
+            }
+
+            batch = ApprovalBatch()
+            for window_from, window_to in self._cache_windows(from_block, to_block):
+                cacheable = (
+                    window_from % EVENT_CACHE_WINDOW == 0
+                    and window_to == window_from + EVENT_CACHE_WINDOW - 1
+                    and current_block - window_to > FINALITY_BLOCKS
+                )
+                # v2: values are ApprovalBatch instances, not dict lists
+                cache_key = (
+                    f"v2:{chain_id}:{wallet_address.lower()}:{window_from}:{window_to}"
+                )
+
+                if cacheable:
+                    cached = self._event_cache.get(cache_key)
+                    if cached is not None:
+                        batch.extend(cached)
+                        continue
+
+                window_batch = await self._scan_window_async(
+                    chain_id, approval_filter, window_from, window_to
+                )
+
+                if cacheable:
+                    self._event_cache.set(cache_key, window_batch)
+
+                batch.extend(window_batch)
+
+            logger.info(f"Found {len(batch)} approvals")
+
+            return batch
+
+        except Exception as e:
+            logger.error(f"Error scanning approval events: {e}")
+            return ApprovalBatch()
+
+    async def _scan_window_async(
+        self, chain_id: int, approval_filter: Dict, from_block: int, to_block: int
+    ) -> ApprovalBatch:
+        """Fetch and parse approval events for one block window"""
+        logs = await self._fetch_logs_chunked_async(
+            chain_id, approval_filter, from_block, to_block
+        )
+
+        block_numbers = {log["blockNumber"] for log in logs}
+        timestamps = await self._fetch_block_timestamps_async(chain_id, block_numbers)
+
+        return self._parse_logs(logs, timestamps)
+
+    async def _get_logs_window_async(
+        self,
+        w3: AsyncWeb3,
+        base_filter: Dict,
+        start: int,
+        end: int,
+        semaphore: asyncio.Semaphore,
+    ) -> List:
+        """
+        Fetch logs for one block window, bisecting on result-limit errors
+        """
+        try:
+            async with semaphore:
+                return await w3.eth.get_logs(
+                    {**base_filter, "fromBlock": start, "toBlock": end}
+                )
+        except Exception as e:
+            message = str(e).lower()
+            retryable = any(
+                hint in message
+                for hint in ("more than", "limit", "too large", "too many", "timeout")
+            )
+            if retryable and end > start:
+                mid = (start + end) // 2
+                logger.debug(
+                    f"eth_getLogs window {start}-{end} hit a provider limit, "
+                    f"bisecting: {e}"
+                )
+                left = await self._get_logs_window_async(
+                    w3, base_filter, start, mid, semaphore
+                )
+                right = await self._get_logs_window_async(
+                    w3, base_filter, mid + 1, end, semaphore
+                )
+                return left + right
+            raise
+
+    async def _fetch_logs_chunked_async(
+        self, chain_id: int, base_filter: Dict, from_block: int, to_block: int
+    ) -> List:
+        """
+        Fetch logs over a block range in LOG_CHUNK_SIZE windows, concurrently
+        """
+        if to_block < from_block:
+            return []
+
+        w3 = self.get_async_web3(chain_id)
+        windows = [
+            (start, min(start + LOG_CHUNK_SIZE - 1, to_block))
+            for start in range(from_block, to_block + 1, LOG_CHUNK_SIZE)
+        ]
+        semaphore = asyncio.Semaphore(LOG_SCAN_MAX_WORKERS)
+
+        results = await asyncio.gather(
+            *(
+                self._get_logs_window_async(w3, base_filter, start, end, semaphore)
+                for start, end in windows
+            ),
+            return_exceptions=True,
+        )
+
+        logs = []
+        for (start, end), result in zip(windows, results):
+            if isinstance(result, Exception):
+                logger.warning(
+                    f"Error fetching logs for blocks {start}-{end} on "
+                    f"chain {chain_id}: {result}"
+                )
+            else:
+                logs.extend(result)
+
+        return logs
+
+    async def _fetch_block_timestamps_async(
+        self, chain_id: int, block_numbers: Iterable[int]
+    ) -> Dict[int, int]:
+        """
+        Fetch timestamps for a set of blocks via batched eth_getBlockByNumber
+
+        Shares the in-process LRU with the sync auditor; only misses hit the
+        RPC, in BLOCK_BATCH_SIZE groups posted concurrently.
+        """
+        timestamps: Dict[int, int] = {}
+        misses = []
+        for block_number in set(block_numbers):
+            cached = self._ts_cache_get(chain_id, block_number)
+            if cached is not None:
+                timestamps[block_number] = cached
+            else:
+                misses.append(block_number)
+
+        blocks = sorted(misses)
+        if not blocks:
+            return timestamps
+
+        rpc_url = CHAIN_CONFIG[chain_id]["rpc"]
+        chunks = [
+            blocks[i : i + BLOCK_BATCH_SIZE]
+            for i in range(0, len(blocks), BLOCK_BATCH_SIZE)
+        ]
+
+        async with aiohttp.ClientSession() as session:
+
+            async def fetch_chunk(chunk):
+                payload = [
+                    {
+                        "jsonrpc": "2.0",
+                        "method": "eth_getBlockByNumber",
+                        "params": [hex(block_number), False],
+                        "id": block_number,
+                    }
+                    for block_number in chunk
+                ]
+                async with session.post(
+                    rpc_url, json=payload, timeout=aiohttp.ClientTimeout(total=30)
+                ) as response:
+                    response.raise_for_status()
+                    return await response.json()
+
+            results = await asyncio.gather(
+                *(fetch_chunk(chunk) for chunk in chunks), return_exceptions=True
+            )
+
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, Exception):
+                logger.warning(
+                    f"Batch block fetch failed on chain {chain_id}: {result}"
+                )
+                continue
+            for item in result:
+                block = item.get("result")
+                if block:
+                    timestamps[int(item["id"])] = int(block["timestamp"], 16)
+
+        for block_number in blocks:
+            if block_number in timestamps:
+                self._ts_cache_put(chain_id, block_number, timestamps[block_number])
+
+        return timestamps
+
+    async def get_current_allowance_async(
+        self, chain_id: int, token_address: str, owner: str, spender: str
+    ) -> Optional[int]:
+        """Get current allowance for an ERC-20 token via async eth_call"""
+        try:
+            w3 = self.get_async_web3(chain_id)
+
+            call_data = (
+                ERC20_ALLOWANCE_SELECTOR
+                + b"\x00" * 12
+                + bytes.fromhex(owner[2:])
+                + b"\x00" * 12
+                + bytes.fromhex(spender[2:])
+            )
+
+            result = await w3.eth.call(
+                {
+                    "to": _checksum(token_address),
+                    "data": call_data,
+                }
+            )
+
+            return int.from_bytes(bytes(result), "big")
+
+        except Exception as e:
+            logger.warning(
+                f"Error getting allowance for {token_address} on chain {chain_id}: {e}"
+            )
+            return None
+
+    async def _fetch_allowances_async(
+        self, chain_id: int, triples: List[Tuple[str, str, str]]
+    ) -> Dict[Tuple[str, str, str], Optional[int]]:
+        """
+        Fetch allowances for the given triples in concurrent chunks
+
+        Mirrors the sync path: reads are split into ALLOWANCE_BATCH_SIZE
+        chunks, each resolved by one Multicall3 aggregate call, gathered
+        concurrently.
+        """
+        if not triples:
+            return {}
+
+        chunks = [
+            triples[i : i + ALLOWANCE_BATCH_SIZE]
+            for i in range(0, len(triples), ALLOWANCE_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(
+            *(self._fetch_allowances_chunk_async(chain_id, chunk) for chunk in chunks)
+        )
+
+        allowances: Dict[Tuple[str, str, str], Optional[int]] = {}
+        for result in results:
+            allowances.update(result)
+        return allowances
+
+    async def _fetch_allowances_chunk_async(
+        self, chain_id: int, triples: List[Tuple[str, str, str]]
+    ) -> Dict[Tuple[str, str, str], Optional[int]]:
+        """
+        Fetch allowances for one chunk of triples, Multicall3 first
+
+        Falls back to concurrent per-triple eth_calls if the aggregate call
+        fails.
+        """
+        w3 = self.get_async_web3(chain_id)
+
+        try:
+            calls = []
+            for token_address, owner, spender in triples:
+                call_data = ERC20_ALLOWANCE_SELECTOR + abi_encode(
+                    ["address", "address"], [owner, spender]
+                )
+                calls.append((_checksum(token_address), True, call_data))
+
+            result = await w3.eth.call(
+                {
+                    "to": MULTICALL3_ADDRESS,
+                    "data": AGGREGATE3_SELECTOR
+                    + abi_encode(["(address,bool,bytes)[]"], [calls]),
+                }
+            )
+
+            results = abi_decode(["(bool,bytes)[]"], bytes(result))[0]
+
+            allowances = {}
+            for triple, (success, return_data) in zip(triples, results):
+                if success and len(return_data) >= 32:
+                    allowances[triple] = int.from_bytes(return_data[:32], "big")
+                else:
+                    allowances[triple] = None
+            return allowances
+
+        except Exception as e:
+            logger.warning(
+                f"Multicall3 allowance fetch failed on chain {chain_id}, "
+                f"falling back to per-call lookups: {e}"
+            )
+            values = await asyncio.gather(
+                *(self.get_current_allowance_async(chain_id, *t) for t in triples)
+            )
+            return dict(zip(triples, values))
+
+    async def analyze_approval_risks_async(
+        self, batch: ApprovalBatch, chain_id: int
+    ) -> List[Dict]:
+        """
+        Analyze approvals for risk factors
+
+        Async counterpart of ApprovalAuditor.analyze_approval_risks.
+        """
+        indices = self._latest_indices(batch)
+        allowances = await self._fetch_allowances_async(
+            chain_id, self._erc20_triples(batch, indices)
+        )
+        return self._flag_risks(batch, indices, allowances)
+
+    async def _audit_chain_async(
+        self,
+        chain_id: int,
+        wallet: str,
+        from_block: int = 0,
+        owner_topic: Optional[str] = None,
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """Scan, analyze, and build revoke data for a single chain"""
+        batch = await self.scan_approval_events_async(
+            chain_id, wallet, from_block, owner_topic=owner_topic
+        )
+        analyzed = await self.analyze_approval_risks_async(batch, chain_id)
+
+        risky_approvals = []
+        revoke_transactions = []
+        for approval in analyzed:
+            if approval.get("risk_flags"):
+                approval["chain_id"] = chain_id
+                approval["chain_name"] = CHAIN_CONFIG[chain_id]["name"]
+
+                revoke_tx = self.build_revoke_transaction(approval, chain_id)
+                if revoke_tx:
+                    revoke_transactions.append(revoke_tx)
+
+                # uint256 values overflow JSON numbers; stringify at the boundary
+                if "value" in approval:
+                    approval["value"] = str(approval["value"])
+
+                risky_approvals.append(approval)
+
+        return risky_approvals, revoke_transactions
+
+    async def audit_wallet_async(
+        self, wallet: str, chains: List[int], from_block: int = 0
+    ) -> Dict:
+        """
+        Complete audit of a wallet across multiple chains, scanned concurrently
+
+        Args:
+            wallet: Wallet address to audit
+            chains: List of chain IDs to scan
+            from_block: Starting block (0 for auto)
+
+        Returns:
+            Complete audit report with approvals, risks, and revoke data
+        """
+        all_approvals = []
+        revoke_transactions = []
+
+        valid_chains = []
+        for chain_id in chains:
+            if chain_id not in CHAIN_CONFIG:
+                logger.warning(f"Chain {chain_id} not supported, skipping")
+                continue
+            valid_chains.append(chain_id)
+
+        # The topic filter is chain-independent; build it once for all scans
+        owner_topic = self._owner_topic(_checksum(wallet))
+
+        results = await asyncio.gather(
+            *(
+                self._audit_chain_async(chain_id, wallet, from_block, owner_topic)
+                for chain_id in valid_chains
+            ),
+            return_exceptions=True,
+        )
+
+        for chain_id, result in zip(valid_chains, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error auditing chain {chain_id}: {result}")
+                continue
+            approvals, revoke_txs = result
+            all_approvals.extend(approvals)
+            revoke_transactions.extend(revoke_txs)
+
+        return {
+            "wallet": wallet,
+            "chains_scanned": chains,
+            "total_approvals": len(all_approvals),
+            "approvals": all_approvals,
+            "revoke_tx_data": revoke_transactions,
+        }
+
+    def audit_wallet(
+        self, wallet: str, chains: List[int], from_block: int = 0
+    ) -> Dict:
+        """Sync wrapper so existing callers can use the async implementation"""
+        return asyncio.run(self.audit_wallet_async(wallet, chains, from_block))
@@ -1,6 +1,7 @@
 """
 Chain configuration for multi-chain approval scanning
 """
+import os
 
 CHAIN_CONFIG = {
     1: {
@@ -47,6 +48,9 @@ CHAIN_CONFIG = {
     },
 }
 
+# Multicall3 is deployed at the same address on all supported chains
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
 # ERC-20 Approval event signature
 # event Approval(address indexed owner, address indexed spender, uint256 value)
 ERC20_APPROVAL_TOPIC = "0x8c5be1e5ebec7d5bd14f71427d1e84f3dd0314c0f7b2291e5b200ac8c7c3b925"
@@ -64,3 +68,32 @@ STALE_APPROVAL_SECONDS = STALE_APPROVAL_DAYS * 24 * 60 * 60
 
 # ERC-20 allowance function signature
 ERC20_ALLOWANCE_FUNCTION = "0xdd62ed3e"  # allowance(address,address)
+
+# Precomputed 4-byte function selectors (keccak of the signature), so hot
+# paths don't rehash constant strings
+ERC20_ALLOWANCE_SELECTOR = bytes.fromhex("dd62ed3e")  # allowance(address,address)
+ERC20_APPROVE_SELECTOR = bytes.fromhex("095ea7b3")  # approve(address,uint256)
+ERC721_SETAPPROVALFORALL_SELECTOR = bytes.fromhex("a22cb465")  # setApprovalForAll(address,bool)
+AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")  # aggregate3((address,bool,bytes)[])
+
+# Max blocks per eth_getBlockByNumber JSON-RPC batch request. Tunable per
+# deployment since providers differ in how large a batch they accept before
+# it gets slower than plain concurrent requests
+BLOCK_BATCH_SIZE = int(os.getenv("BLOCK_BATCH_SIZE", "100"))
+
+# Max allowance reads packed into one Multicall3 aggregate3 call; larger
+# wallets are split into this many per call, fetched concurrently
+ALLOWANCE_BATCH_SIZE = int(os.getenv("ALLOWANCE_BATCH_SIZE", "200"))
+
+# Block window per eth_getLogs request; large single-shot ranges time out on
+# public RPCs, so scans are split into windows fetched concurrently
+LOG_CHUNK_SIZE = 2000
+LOG_SCAN_MAX_WORKERS = 8
+
+# Scans are cached on disk in fixed windows aligned to this size, so window
+# boundaries are stable across runs
+EVENT_CACHE_WINDOW = 10_000
+
+# Blocks behind the head after which a window is treated as immutable and
+# safe to cache forever
+FINALITY_BLOCKS = 128
@@ -3,14 +3,19 @@ Approval Risk Auditor - Flag unlimited or stale token approvals
 
 x402 micropayment-enabled approval auditing service
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
-from pydantic import BaseModel, Field
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional, Dict
-from datetime import datetime
+from datetime import datetime, timezone
+import asyncio
+import hashlib
 import os
 import logging
+import re
+
+import orjson
 
 from src.approval_auditor import ApprovalAuditor
 from src.chain_config import CHAIN_CONFIG
@@ -23,13 +28,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Interactive docs are opt-in: serving them registers extra routes and makes
+# every startup pay for OpenAPI schema generation, and production callers are
+# agents, not browsers
+enable_docs = os.getenv("ENABLE_DOCS", "false").lower() == "true"
+
 # Initialize FastAPI
 app = FastAPI(
     title="Approval Risk Auditor",
     description="Flag unlimited or stale ERC-20/NFT approvals and build revoke calls",
     version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc",
+    docs_url="/docs" if enable_docs else None,
+    redoc_url="/redoc" if enable_docs else None,
+    openapi_url="/openapi.json" if enable_docs else None,
+    default_response_class=ORJSONResponse,
 )
 
 # Configuration
@@ -37,13 +49,23 @@ payment_address = os.getenv("PAYMENT_ADDRESS", "0x01D11F7e1a46AbFC6092d7be484895
 base_url = os.getenv("BASE_URL", "https://approval-risk-auditor-production.up.railway.app")
 free_mode = os.getenv("FREE_MODE", "false").lower() == "true"
 
-# CORS
+# URLs derived from base_url, shared by the metadata payloads below
+AGENT_URL = base_url.replace("https://", "http://") + "/"
+RESOURCE_URL = f"{base_url}/entrypoints/approval-risk-auditor/invoke"
+
+# CORS - an explicit allowlist lets the middleware precompute its headers at
+# init instead of echoing request-specific values on every response
+allowed_origins = [
+    origin.strip()
+    for origin in os.getenv("ALLOWED_ORIGINS", base_url).split(",")
+    if origin.strip()
+]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=allowed_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "HEAD"],
+    allow_headers=["Content-Type", "X-PAYMENT", "X-Payment-Txhash"],
 )
 
 # x402 Payment Verification Middleware
@@ -63,6 +85,26 @@ logger.info(f"Running in {'FREE' if free_mode else 'PAID'} mode")
 # Initialize auditor
 auditor = ApprovalAuditor()
 
+# Optional short-TTL memoization of audit results, enabled by setting
+# REDIS_URL. Approvals rarely change within a minute, so repeat queries for
+# the same wallet/chains are served from cache instead of re-scanning.
+AUDIT_CACHE_TTL_SECONDS = 60
+
+redis_url = os.getenv("REDIS_URL")
+audit_cache = None
+if redis_url:
+    import redis.asyncio as aioredis
+
+    audit_cache = aioredis.from_url(redis_url)
+    logger.info("Audit result caching enabled via Redis")
+
+# Supported chain IDs, resolved once for request validation
+SUPPORTED_CHAINS = frozenset(CHAIN_CONFIG)
+SUPPORTED_CHAINS_LIST = sorted(SUPPORTED_CHAINS)
+
+# EVM address shape; malformed wallets are rejected before any RPC work
+_ADDR_RE = re.compile(r"^0x[0-9a-fA-F]{40}$")
+
 
 # Request/Response Models
 class AuditRequest(BaseModel):
@@ -79,6 +121,24 @@ class AuditRequest(BaseModel):
         example=[1, 137, 42161],
     )
 
+    @field_validator("wallet")
+    @classmethod
+    def _validate_wallet(cls, v: str) -> str:
+        if not _ADDR_RE.match(v):
+            raise ValueError("Invalid wallet address")
+        # Canonicalize once so downstream cache keys and dedup are stable
+        return v.lower()
+
+    @field_validator("chains")
+    @classmethod
+    def _validate_chains(cls, v: List[int]) -> List[int]:
+        unsupported = [c for c in v if c not in SUPPORTED_CHAINS]
+        if unsupported:
+            raise ValueError(
+                f"Unsupported chains {unsupported}. Supported: {SUPPORTED_CHAINS_LIST}"
+            )
+        return v
+
 
 class ApprovalInfo(BaseModel):
     """Information about a single approval"""
@@ -121,15 +181,27 @@ class AuditResponse(BaseModel):
     total_approvals: int
     approvals: List[Dict]
     revoke_tx_data: List[Dict]
-    timestamp: str
+    timestamp: datetime
 
 
-# Landing Page
-@app.get("/", response_class=HTMLResponse)
-@app.head("/")
-async def root():
-    """Landing page"""
-    html_content = f"""
+# Landing page is static once payment_address/free_mode are resolved, so
+# render and encode it a single time at import instead of per request
+_docs_section = (
+    """            <div class="section">
+                <h2>Documentation</h2>
+                <p>Interactive API documentation:</p>
+                <div style="margin: 20px 0;">
+                    <a href="/docs" style="display: inline-block; background: rgba(239, 68, 68, 0.2); padding: 10px 20px; border-radius: 5px; margin-right: 10px;">Swagger UI</a>
+                    <a href="/redoc" style="display: inline-block; background: rgba(239, 68, 68, 0.2); padding: 10px 20px; border-radius: 5px;">ReDoc</a>
+                </div>
+            </div>
+
+"""
+    if enable_docs
+    else ""
+)
+
+_LANDING_HTML = f"""
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -399,16 +471,7 @@ async def root():
                 </div>
             </div>
 
-            <div class="section">
-                <h2>Documentation</h2>
-                <p>Interactive API documentation:</p>
-                <div style="margin: 20px 0;">
-                    <a href="/docs" style="display: inline-block; background: rgba(239, 68, 68, 0.2); padding: 10px 20px; border-radius: 5px; margin-right: 10px;">Swagger UI</a>
-                    <a href="/redoc" style="display: inline-block; background: rgba(239, 68, 68, 0.2); padding: 10px 20px; border-radius: 5px;">ReDoc</a>
-                </div>
-            </div>
-
-            <footer>
+{_docs_section}            <footer>
                 <p><strong>Built by DeganAI</strong></p>
                 <p>Bounty #5 Submission for Daydreams AI Agent Bounties</p>
             </footer>
@@ -416,20 +479,31 @@ async def root():
     </body>
     </html>
     """
-    return HTMLResponse(content=html_content)
+_LANDING_BYTES = _LANDING_HTML.encode("utf-8")
 
 
-# AP2 (Agent Payments Protocol) Metadata
-@app.get("/.well-known/agent.json")
-@app.head("/.well-known/agent.json")
-async def agent_metadata():
-    """AP2 metadata - returns HTTP 200"""
-    base_url = os.getenv("BASE_URL", "https://approval-risk-auditor-production.up.railway.app")
+# Landing Page
+@app.get("/", response_class=HTMLResponse)
+def root():
+    """Landing page"""
+    return Response(content=_LANDING_BYTES, media_type="text/html; charset=utf-8")
+
 
-    agent_json = {
+@app.head("/")
+def root_head():
+    """Landing page HEAD probe - headers only, no body work"""
+    return Response(
+        media_type="text/html; charset=utf-8",
+        headers={"Content-Length": str(len(_LANDING_BYTES))},
+    )
+
+
+# AP2 (Agent Payments Protocol) metadata is fixed at startup; build and
+# serialize it once instead of rebuilding the dict on every request
+_AGENT_JSON = {
         "name": "Approval Risk Auditor",
         "description": "Flag unlimited or stale ERC-20/NFT approvals and build revoke calls. Scans 7 chains to detect risky token approvals.",
-        "url": base_url.replace("https://", "http://") + "/",
+        "url": AGENT_URL,
         "version": "1.0.0",
         "capabilities": {
             "streaming": False,
@@ -529,25 +603,43 @@ async def agent_metadata():
             }
         ],
     }
+_AGENT_JSON_BYTES = orjson.dumps(_AGENT_JSON)
+_AGENT_JSON_ETAG = '"' + hashlib.blake2b(_AGENT_JSON_BYTES, digest_size=8).hexdigest() + '"'
+
 
-    return JSONResponse(content=agent_json, status_code=200)
+# AP2 (Agent Payments Protocol) Metadata
+@app.get("/.well-known/agent.json")
+def agent_metadata(request: Request):
+    """AP2 metadata - returns HTTP 200; facilitator polls get 304s via ETag"""
+    if request.headers.get("if-none-match") == _AGENT_JSON_ETAG:
+        return Response(status_code=304)
+    return Response(
+        content=_AGENT_JSON_BYTES,
+        media_type="application/json",
+        headers={"ETag": _AGENT_JSON_ETAG, "Cache-Control": "public, max-age=300"},
+    )
 
 
-# x402 Protocol Metadata
-@app.get("/.well-known/x402")
-@app.head("/.well-known/x402")
-async def x402_metadata():
-    """x402 protocol metadata - returns HTTP 402"""
-    base_url = os.getenv("BASE_URL", "https://approval-risk-auditor-production.up.railway.app")
+@app.head("/.well-known/agent.json")
+def agent_metadata_head():
+    """AP2 metadata HEAD probe"""
+    return Response(
+        media_type="application/json",
+        headers={
+            "Content-Length": str(len(_AGENT_JSON_BYTES)),
+            "ETag": _AGENT_JSON_ETAG,
+        },
+    )
+
 
-    metadata = {
+_X402_METADATA = {
         "x402Version": 1,
         "accepts": [
             {
                 "scheme": "exact",
                 "network": "base",
                 "maxAmountRequired": "50000",
-                "resource": f"{base_url}/entrypoints/approval-risk-auditor/invoke",
+                "resource": RESOURCE_URL,
                 "description": "Audit wallet for risky ERC-20/NFT approvals and generate revocation transactions",
                 "mimeType": "application/json",
                 "payTo": payment_address,
@@ -556,49 +648,87 @@ async def x402_metadata():
             }
         ],
     }
+_X402_METADATA_BYTES = orjson.dumps(_X402_METADATA)
+_X402_METADATA_ETAG = '"' + hashlib.blake2b(_X402_METADATA_BYTES, digest_size=8).hexdigest() + '"'
 
-    return JSONResponse(content=metadata, status_code=402)
+
+# x402 Protocol Metadata
+@app.get("/.well-known/x402")
+def x402_metadata(request: Request):
+    """x402 protocol metadata - returns HTTP 402; polls get 304s via ETag"""
+    if request.headers.get("if-none-match") == _X402_METADATA_ETAG:
+        return Response(status_code=304)
+    return Response(
+        content=_X402_METADATA_BYTES,
+        media_type="application/json",
+        status_code=402,
+        headers={"ETag": _X402_METADATA_ETAG, "Cache-Control": "public, max-age=300"},
+    )
+
+
+@app.head("/.well-known/x402")
+def x402_metadata_head():
+    """x402 protocol metadata HEAD probe"""
+    return Response(
+        status_code=402,
+        media_type="application/json",
+        headers={
+            "Content-Length": str(len(_X402_METADATA_BYTES)),
+            "ETag": _X402_METADATA_ETAG,
+        },
+    )
+
+
+_FAVICON_BYTES = (
+    '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100">'
+    '<text y=".9em" font-size="90">🔒</text></svg>'
+).encode("utf-8")
 
 
 @app.get("/favicon.ico")
-async def favicon():
+def favicon():
     """Favicon endpoint"""
-    from fastapi.responses import Response
-    svg_content = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><text y=".9em" font-size="90">🔒</text></svg>'
-    return Response(content=svg_content, media_type="image/svg+xml")
+    return Response(content=_FAVICON_BYTES, media_type="image/svg+xml")
 
 
-# Health Check
-@app.get("/health")
-async def health():
-    """Health check"""
-    supported_chains = list(CHAIN_CONFIG.keys())
-    return {
+# CHAIN_CONFIG and free_mode are fixed at runtime, so the /health and
+# /chains payloads can be frozen at import like the metadata above
+_HEALTH_BYTES = orjson.dumps(
+    {
         "status": "healthy",
-        "supported_chains": len(supported_chains),
-        "chain_ids": supported_chains,
+        "supported_chains": len(CHAIN_CONFIG),
+        "chain_ids": list(CHAIN_CONFIG.keys()),
         "free_mode": free_mode,
     }
+)
+
+_CHAINS_BYTES = orjson.dumps(
+    {
+        "chains": [
+            {"chain_id": chain_id, "name": config["name"], "symbol": config["symbol"]}
+            for chain_id, config in CHAIN_CONFIG.items()
+        ],
+        "total": len(CHAIN_CONFIG),
+    }
+)
+
+
+# Health Check
+@app.get("/health")
+def health():
+    """Health check"""
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 
 # List Chains
 @app.get("/chains")
-async def list_chains():
+def list_chains():
     """List all supported chains"""
-    chains = []
-
-    for chain_id, config in CHAIN_CONFIG.items():
-        chains.append({
-            "chain_id": chain_id,
-            "name": config["name"],
-            "symbol": config["symbol"],
-        })
-
-    return {"chains": chains, "total": len(chains)}
+    return Response(content=_CHAINS_BYTES, media_type="application/json")
 
 
 # Main Audit Endpoint
-@app.post("/approvals/audit", response_model=AuditResponse)
+@app.post("/approvals/audit")
 async def audit_approvals(request: AuditRequest):
     """
     Audit a wallet for risky token approvals
@@ -615,99 +745,197 @@ async def audit_approvals(request: AuditRequest):
     - Risk flags for each approval
     - Transaction data to revoke approvals
     """
-    try:
-        logger.info(
-            f"Audit request: wallet={request.wallet}, chains={request.chains}"
-        )
+    logger.info(
+        f"Audit request: wallet={request.wallet}, chains={request.chains}"
+    )
+
+    cache_key = None
+    if audit_cache is not None:
+        chains_part = ",".join(map(str, sorted(request.chains)))
+        cache_key = f"audit:{request.wallet.lower()}:{chains_part}"
+        try:
+            cached = await audit_cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Audit cache read failed: {e}")
+            cached = None
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+
+    # Fan out one task per chain so total latency is the slowest chain, not
+    # the sum of all of them. return_exceptions keeps per-chain failures out
+    # of the exception path: they are data, handled by explicit branches
+    results = await asyncio.gather(
+        *(
+            asyncio.to_thread(auditor.audit_single_chain, request.wallet, chain_id, 0)
+            for chain_id in request.chains
+        ),
+        return_exceptions=True,
+    )
 
-        # Validate chains
-        for chain_id in request.chains:
-            if chain_id not in CHAIN_CONFIG:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Chain {chain_id} not supported. Supported: {list(CHAIN_CONFIG.keys())}",
-                )
-
-        # Perform audit
-        result = auditor.audit_wallet(
-            wallet=request.wallet,
-            chains=request.chains,
-            from_block=0,
+    if results and all(isinstance(r, Exception) for r in results):
+        return ORJSONResponse(
+            {"detail": "Failed to audit wallet. RPC may be unavailable."},
+            status_code=503,
         )
 
-        if not result:
-            raise HTTPException(
-                status_code=503,
-                detail="Failed to audit wallet. RPC may be unavailable.",
-            )
+    all_approvals = []
+    revoke_tx_data = []
+    for chain_id, result in zip(request.chains, results):
+        if isinstance(result, Exception):
+            logger.error(f"Audit failed on chain {chain_id}: {result}")
+            continue
+        approvals, revoke_txs = result
+        all_approvals.extend(approvals)
+        revoke_tx_data.extend(revoke_txs)
+
+    # The auditor owns this shape (see AuditResponse); serialize it
+    # directly instead of paying a Pydantic validation pass over what can
+    # be thousands of approval dicts
+    result = {
+        "wallet": request.wallet,
+        "chains_scanned": request.chains,
+        "total_approvals": len(all_approvals),
+        "approvals": all_approvals,
+        "revoke_tx_data": revoke_tx_data,
+        "timestamp": datetime.now(timezone.utc),
+    }
 
-        return AuditResponse(
-            wallet=result["wallet"],
-            chains_scanned=result["chains_scanned"],
-            total_approvals=result["total_approvals"],
-            approvals=result["approvals"],
-            revoke_tx_data=result["revoke_tx_data"],
-            timestamp=datetime.utcnow().isoformat() + "Z",
-        )
+    if cache_key is not None:
+        payload = orjson.dumps(result)
+        try:
+            await audit_cache.set(cache_key, payload, ex=AUDIT_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Audit cache write failed: {e}")
+        return Response(content=payload, media_type="application/json")
+
+    return ORJSONResponse(result)
+
+
+# Invoke-body schema advertised to x402 clients, shared by the discovery
+# payload below and kept at module level so it is built exactly once
+_X402_OUTPUT_SCHEMA = {
+    "input": {
+        "type": "http",
+        "method": "POST",
+        "bodyType": "json",
+        "bodyFields": {
+            "wallet": {
+                "type": "string",
+                "required": True,
+                "description": "Wallet address to audit"
+            },
+            "chains": {
+                "type": "array",
+                "required": True,
+                "description": "List of chain IDs to scan (e.g., [1, 137, 42161])"
+            }
+        }
+    },
+    "output": {
+        "type": "object",
+        "description": "Approval risk audit results with flagged tokens and revoke transactions"
+    }
+}
+
+_ENTRYPOINT_402 = {
+    "x402Version": 1,
+    "accepts": [{
+        "scheme": "exact",
+        "network": "base",
+        "maxAmountRequired": "50000",  # 0.05 USDC (6 decimals)
+        "resource": RESOURCE_URL,
+        "description": "Approval Risk Auditor - Flag unlimited or stale token approvals",
+        "mimeType": "application/json",
+        "payTo": payment_address,
+        "maxTimeoutSeconds": 30,
+        "asset": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",  # USDC on Base
+        "outputSchema": _X402_OUTPUT_SCHEMA
+    }]
+}
+_ENTRYPOINT_402_BYTES = orjson.dumps(_ENTRYPOINT_402)
+_ENTRYPOINT_402_ETAG = '"' + hashlib.blake2b(_ENTRYPOINT_402_BYTES, digest_size=8).hexdigest() + '"'
+
+
+# Streaming Audit Endpoint
+@app.post("/approvals/audit/stream")
+async def audit_approvals_stream(request: AuditRequest):
+    """
+    Audit a wallet and stream flagged approvals as NDJSON
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Audit error: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail=f"Internal server error: {str(e)}",
-        )
+    Emits one approval per line as each chain finishes, so clients see
+    results from the fastest chains immediately instead of waiting for the
+    slowest, and the full result set is never buffered server-side. A final
+    summary line carries the totals and revoke transaction data.
+    """
+    logger.info(
+        f"Streamed audit request: wallet={request.wallet}, chains={request.chains}"
+    )
+
+    async def generate():
+        tasks = [
+            asyncio.create_task(
+                asyncio.to_thread(auditor.audit_single_chain, request.wallet, chain_id, 0)
+            )
+            for chain_id in request.chains
+        ]
+
+        total_approvals = 0
+        revoke_tx_data = []
+        for task in asyncio.as_completed(tasks):
+            try:
+                approvals, revoke_txs = await task
+            except Exception as e:
+                logger.error(f"Streamed audit failed on a chain: {e}")
+                continue
+            revoke_tx_data.extend(revoke_txs)
+            for approval in approvals:
+                total_approvals += 1
+                yield orjson.dumps(approval) + b"\n"
+
+        yield orjson.dumps(
+            {
+                "wallet": request.wallet,
+                "chains_scanned": request.chains,
+                "total_approvals": total_approvals,
+                "revoke_tx_data": revoke_tx_data,
+                "timestamp": datetime.now(timezone.utc),
+            }
+        ) + b"\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 
 # AP2 Entrypoint - GET/HEAD for x402 discovery
+def _entrypoint_402_response() -> Response:
+    """The precomputed 402 discovery payload with cache headers"""
+    return Response(
+        content=_ENTRYPOINT_402_BYTES,
+        media_type="application/json",
+        status_code=402,
+        headers={"ETag": _ENTRYPOINT_402_ETAG, "Cache-Control": "public, max-age=300"},
+    )
+
+
 @app.get("/entrypoints/approval-risk-auditor/invoke")
-@app.head("/entrypoints/approval-risk-auditor/invoke")
-async def entrypoint_audit_get():
+def entrypoint_audit_get(request: Request):
     """
     x402 discovery endpoint - returns HTTP 402 for x402scan registration
     """
-    base_url = os.getenv("BASE_URL", "https://approval-risk-auditor-production.up.railway.app")
+    if request.headers.get("if-none-match") == _ENTRYPOINT_402_ETAG:
+        return Response(status_code=304)
+    return _entrypoint_402_response()
 
-    return JSONResponse(
+
+@app.head("/entrypoints/approval-risk-auditor/invoke")
+def entrypoint_audit_head():
+    """x402 discovery HEAD probe"""
+    return Response(
         status_code=402,
-        content={
-            "x402Version": 1,
-            "accepts": [{
-                "scheme": "exact",
-                "network": "base",
-                "maxAmountRequired": "50000",  # 0.05 USDC (6 decimals)
-                "resource": f"{base_url}/entrypoints/approval-risk-auditor/invoke",
-                "description": "Approval Risk Auditor - Flag unlimited or stale token approvals",
-                "mimeType": "application/json",
-                "payTo": payment_address,
-                "maxTimeoutSeconds": 30,
-                "asset": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",  # USDC on Base
-                "outputSchema": {
-                    "input": {
-                        "type": "http",
-                        "method": "POST",
-                        "bodyType": "json",
-                        "bodyFields": {
-                            "wallet": {
-                                "type": "string",
-                                "required": True,
-                                "description": "Wallet address to audit"
-                            },
-                            "chains": {
-                                "type": "array",
-                                "required": True,
-                                "description": "List of chain IDs to scan (e.g., [1, 137, 42161])"
-                            }
-                        }
-                    },
-                    "output": {
-                        "type": "object",
-                        "description": "Approval risk audit results with flagged tokens and revoke transactions"
-                    }
-                }
-            }]
-        }
+        media_type="application/json",
+        headers={
+            "Content-Length": str(len(_ENTRYPOINT_402_BYTES)),
+            "ETag": _ENTRYPOINT_402_ETAG,
+        },
     )
 
 
@@ -727,11 +955,11 @@ async def entrypoint_audit_post(request: Optional[AuditRequest] = None, x_paymen
     """
     # Return 402 if no request body provided
     if request is None:
-        return await entrypoint_audit_get()
+        return _entrypoint_402_response()
 
     # In FREE_MODE, bypass payment check
     if not free_mode and not x_payment_txhash:
-        return await entrypoint_audit_get()
+        return _entrypoint_402_response()
 
     return await audit_approvals(request)
 
@@ -740,4 +968,12 @@ if __name__ == "__main__":
     import uvicorn
 
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    uvicorn.run(
+        "src.main:app",
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 2)),
+        log_level="info",
+    )
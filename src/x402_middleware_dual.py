@@ -8,17 +8,40 @@ import json
 import base64
 import aiohttp
 from typing import Optional, List, Tuple
-from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
 
 logger = logging.getLogger(__name__)
 
+# Paths that require an x402 payment; everything else bypasses the
+# middleware with a single set lookup
+PAID_PATHS = frozenset({"/entrypoints/approval-risk-auditor/invoke"})
+
+# Invoke-body schema embedded in every 402 payload; defined once instead of
+# as a dict literal inside each response builder
+_OUTPUT_SCHEMA = {
+    "input": {
+        "type": "http",
+        "method": "POST",
+        "bodyType": "json",
+        "bodyFields": {
+            "wallet": {"type": "string", "required": True, "description": "Wallet address to audit"},
+            "chains": {"type": "array", "required": True, "description": "List of chain IDs to scan"}
+        }
+    },
+    "output": {"type": "object", "description": "Approval risk audit results"}
+}
+
 
-class X402Middleware(BaseHTTPMiddleware):
+class X402Middleware:
     """
     Middleware for x402 payment verification with dual facilitator support
 
+    Implemented as a pure ASGI middleware: non-HTTP scopes, free mode, and
+    every path outside PAID_PATHS are passed straight through before any
+    verification work, so payment checks cost an O(1) lookup for the bulk
+    of traffic (health probes, metadata polls, docs).
+
     Tries multiple facilitators in order:
     1. Daydreams facilitator (primary)
     2. Coinbase CDP facilitator (fallback + Bazaar registration)
@@ -32,7 +55,7 @@ class X402Middleware(BaseHTTPMiddleware):
         facilitator_urls: List[str] = None,
         free_mode: bool = False,
     ):
-        super().__init__(app)
+        self.app = app
         self.payment_address = payment_address
         self.base_url = base_url
         self.free_mode = free_mode
@@ -160,68 +183,49 @@ class X402Middleware(BaseHTTPMiddleware):
                     "payTo": self.payment_address,
                     "maxTimeoutSeconds": 30,
                     "asset": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",  # USDC on Base
-                    "outputSchema": {
-                        "input": {
-                            "type": "http",
-                            "method": "POST",
-                            "bodyType": "json",
-                            "bodyFields": {
-                                "wallet": {"type": "string", "required": True, "description": "Wallet address to audit"},
-                                "chains": {"type": "array", "required": True, "description": "List of chain IDs to scan"}
-                            }
-                        },
-                        "output": {"type": "object", "description": "Approval risk audit results"}
-                    }
+                    "outputSchema": _OUTPUT_SCHEMA
                 }
             ]
         }
         return JSONResponse(content=metadata, status_code=402)
 
-    async def dispatch(self, request: Request, call_next):
-        """Process request and verify payment if required"""
-
-        # Skip payment verification in free mode
-        if self.free_mode:
-            logger.debug("FREE_MODE enabled, skipping payment verification")
-            return await call_next(request)
-
-        # Skip verification for health check and metadata endpoints
-        skip_paths = ["/health", "/.well-known", "/docs", "/redoc", "/openapi.json"]
-        # Check for exact root path match separately
-        if request.url.path == "/" or any(request.url.path.startswith(path) for path in skip_paths):
-            return await call_next(request)
-
-        # Check for payment endpoints (those that require payment)
-        # These are typically POST endpoints that provide actual functionality
-        requires_payment = (
-            request.method == "POST" and
-            "/entrypoints/" in request.url.path
-        )
+    async def __call__(self, scope, receive, send):
+        """Verify payment on paid paths; pass everything else straight through"""
+
+        # Only POSTs to paid paths need verification; free mode, non-HTTP
+        # scopes, CORS preflights, and discovery GETs all short-circuit here
+        if (
+            scope["type"] != "http"
+            or self.free_mode
+            or scope["method"] != "POST"
+            or scope["path"] not in PAID_PATHS
+        ):
+            return await self.app(scope, receive, send)
 
-        if not requires_payment:
-            # Allow GET requests through (they're for discovery/metadata)
-            return await call_next(request)
+        path = scope["path"]
+        resource_url = f"{self.base_url}{path}"
 
         # Check for X-Payment header
-        payment_header = request.headers.get("X-Payment")
+        payment_header = Headers(scope=scope).get("x-payment")
 
         if not payment_header:
-            logger.info(f"Payment required for {request.url.path}, no X-Payment header provided")
-            return self.create_402_response(
-                resource_url=str(request.url),
+            logger.info(f"Payment required for {path}, no X-Payment header provided")
+            response = self.create_402_response(
+                resource_url=resource_url,
                 description="Payment required to access this resource"
             )
+            return await response(scope, receive, send)
 
         # Verify payment via facilitators
         is_valid, error_message = await self.verify_payment(
             payment_header=payment_header,
-            resource_url=str(request.url),
+            resource_url=resource_url,
             amount_required="50000"  # 0.05 USDC
         )
 
         if not is_valid:
             logger.warning(f"Payment verification failed: {error_message}")
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=402,
                 content={
                     "error": "Payment verification failed",
@@ -231,28 +235,18 @@ class X402Middleware(BaseHTTPMiddleware):
                         "scheme": "exact",
                         "network": "base",
                         "maxAmountRequired": "50000",
-                        "resource": str(request.url),
+                        "resource": resource_url,
                         "description": "Payment required to access this resource",
                         "mimeType": "application/json",
                         "payTo": self.payment_address,
                         "maxTimeoutSeconds": 30,
                         "asset": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
-                        "outputSchema": {
-                            "input": {
-                                "type": "http",
-                                "method": "POST",
-                                "bodyType": "json",
-                                "bodyFields": {
-                                    "wallet": {"type": "string", "required": True, "description": "Wallet address to audit"},
-                                    "chains": {"type": "array", "required": True, "description": "List of chain IDs to scan"}
-                                }
-                            },
-                            "output": {"type": "object", "description": "Approval risk audit results"}
-                        }
+                        "outputSchema": _OUTPUT_SCHEMA
                     }]
                 }
             )
+            return await response(scope, receive, send)
 
         # Payment verified, proceed with request
-        logger.info(f"Payment verified, processing request to {request.url.path}")
-        return await call_next(request)
+        logger.info(f"Payment verified, processing request to {path}")
+        return await self.app(scope, receive, send)